@@ -1,8 +1,180 @@
+import os
+
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import scipy.stats as stats
-import seaborn as sns
+import scipy.linalg
+import scipy.sparse
+
+try:
+    from numba import njit
+
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+try:
+    from joblib import Parallel, delayed
+
+    _JOBLIB_AVAILABLE = True
+except ImportError:
+    _JOBLIB_AVAILABLE = False
+
+# Below this many samples the worker dispatch overhead outweighs the
+# parallel speedup, so the Gram factors are built in a single BLAS call.
+_PARALLEL_MIN_SAMPLES = 50_000
+
+# Categorical columns with more unique values than this get a sparse one-hot
+# block: the dense block would be mostly zeros.
+_SPARSE_CATEGORY_THRESHOLD = 16
+
+
+def _partial_gram(X_chunk, y_chunk):
+    """Partial Gram factors (X.T X, X.T y, column sums, y sum) for one chunk.
+
+    Accepts dense or sparse X; the products of a sparse chunk are densified,
+    since the Gram matrix itself is small and the descent kernels are dense.
+    """
+    XtX = X_chunk.T @ X_chunk
+    if scipy.sparse.issparse(XtX):
+        XtX = XtX.toarray()
+    return (
+        XtX,
+        np.asarray(X_chunk.T @ y_chunk).ravel(),
+        np.asarray(X_chunk.sum(axis=0)).ravel(),
+        y_chunk.sum(),
+    )
+
+
+def _gram_factors(X, y):
+    """
+    Compute the bias-augmented Gram factors G = X_b.T @ X_b and
+    h = X_b.T @ y without ever materializing the all-ones bias column: its
+    contributions are just the sample count, the column sums of X, and the
+    sum of y, which are filled into the border of G and h directly.
+
+    For large sample counts the rows are split across CPU cores and the
+    partial products summed, which is exact: the Gram build is trivially
+    data-parallel over rows.
+    """
+    m, n = X.shape
+    if (
+        _JOBLIB_AVAILABLE
+        and m >= _PARALLEL_MIN_SAMPLES
+        and not scipy.sparse.issparse(X)
+    ):
+        n_jobs = os.cpu_count() or 1
+        parts = Parallel(n_jobs=n_jobs, backend="loky")(
+            delayed(_partial_gram)(X_chunk, y_chunk)
+            for X_chunk, y_chunk in zip(
+                np.array_split(X, n_jobs), np.array_split(y, n_jobs)
+            )
+        )
+        XtX = sum(part[0] for part in parts)
+        Xty = sum(part[1] for part in parts)
+        col_sums = sum(part[2] for part in parts)
+        y_sum = sum(part[3] for part in parts)
+    else:
+        XtX, Xty, col_sums, y_sum = _partial_gram(X, y)
+
+    G = np.empty((n + 1, n + 1), dtype=X.dtype)
+    G[0, 0] = m
+    G[0, 1:] = col_sums
+    G[1:, 0] = col_sums
+    G[1:, 1:] = XtX
+    h = np.empty(n + 1, dtype=X.dtype)
+    h[0] = y_sum
+    h[1:] = Xty
+    return G, h
+
+
+def _power_iteration_lmax(A, n_iter=8):
+    """
+    Estimate the largest eigenvalue of the symmetric PSD matrix A with a few
+    power iterations. Used to pick a stable gradient-descent step size from
+    the curvature of the loss, so a handful of O(n^2) products replaces a
+    full eigendecomposition.
+    """
+    v = np.random.rand(A.shape[0]).astype(A.dtype)
+    for _ in range(n_iter):
+        v = A @ v
+        v /= np.linalg.norm(v)
+    return float(v @ (A @ v))
+
+
+def _gd_kernel(X, y, theta, learning_rate, iterations, tol, history_theta, mse_history):
+    """
+    Gradient-descent inner loop, compiled with Numba when available.
+
+    Works on X without a bias column: the intercept theta[0] is updated from
+    the residual sum, since multiplying the ones column against the error is
+    just sum(error). Updates `theta` in-place and fills the preallocated
+    `history_theta`/`mse_history` arrays, stopping early once the gradient
+    norm drops below `tol` (checked every 10 epochs). Returns the number of
+    epochs actually run. Keeping the whole loop in one compiled function
+    removes the Python/BLAS dispatch overhead that dominates for small
+    problems.
+    """
+    m = X.shape[0]
+    coef = theta[1:]
+    # Hoisted work buffers: every epoch writes into these via out= instead of
+    # allocating fresh error/gradient arrays. X.T is copied contiguous once
+    # so the backward gemv stays on the fast path.
+    error = np.empty(m, dtype=X.dtype)
+    grad_coef = np.empty(coef.shape[0], dtype=X.dtype)
+    Xt = np.ascontiguousarray(X.T)
+    for epoch in range(iterations):
+        np.dot(X, coef, error)
+        error += theta[0]
+        error -= y
+        mse_history[epoch] = (error @ error) / m
+        np.dot(Xt, error, grad_coef)
+        grad_coef *= 2.0 / m
+        grad_int = (2.0 / m) * error.sum()
+        grad_sq = grad_coef @ grad_coef + grad_int * grad_int
+        grad_coef *= learning_rate
+        coef -= grad_coef
+        theta[0] -= learning_rate * grad_int
+        history_theta[epoch] = theta
+        if epoch % 10 == 0 and grad_sq < tol * tol * (1.0 + theta @ theta):
+            return epoch + 1
+    return iterations
+
+
+def _gd_gram_kernel(
+    G, h, yty, m, theta, learning_rate, iterations, tol, history_theta, mse_history
+):
+    """
+    Gradient-descent inner loop on the precomputed Gram factors.
+
+    For squared loss the gradient is 2(G theta - h)/m with G = X_b.T @ X_b
+    and h = X_b.T @ y, so once those are built each epoch costs O(n^2)
+    regardless of the number of samples. The MSE is recovered from the
+    quadratic form theta.T G theta - 2 theta.T h + y.T y without touching X.
+    Stops early once the gradient norm drops below `tol` (checked every 10
+    epochs) and returns the number of epochs actually run.
+    """
+    # Hoisted work buffers, written via out= each epoch instead of allocating
+    Gt = np.empty(theta.shape[0], dtype=G.dtype)
+    grad = np.empty(theta.shape[0], dtype=G.dtype)
+    for epoch in range(iterations):
+        np.dot(G, theta, Gt)
+        # Reuse the gradient's G @ theta for the loss: one gemv per epoch.
+        # The quadratic form can come out a hair negative in float32 near
+        # convergence, so clamp it to keep the recorded MSE valid.
+        mse_history[epoch] = max(0.0, (theta @ Gt - 2.0 * (theta @ h) + yty) / m)
+        np.subtract(Gt, h, grad)
+        grad *= 2.0 / m
+        grad_sq = grad @ grad
+        grad *= learning_rate
+        theta -= grad
+        history_theta[epoch] = theta
+        if epoch % 10 == 0 and grad_sq < tol * tol * (1.0 + theta @ theta):
+            return epoch + 1
+    return iterations
+
+
+if _NUMBA_AVAILABLE:
+    _gd_kernel = njit(cache=True, fastmath=True)(_gd_kernel)
+    _gd_gram_kernel = njit(cache=True, fastmath=True)(_gd_gram_kernel)
 
 
 class LinearRegressor:
@@ -13,38 +185,84 @@ class LinearRegressor:
     def __init__(self):
         self.coefficients = None
         self.intercept = None
+        self.intercept_history = None
+        self.coefficients_history = None
+        self.training_history_ = None
+        self._Xb_buffer = None
 
     """
     This next "fit" function is a general function that either calls the *fit_multiple* code that
     you wrote last week, or calls a new method, called *fit_gradient_descent*, not implemented (yet)
     """
 
-    def fit(self, X, y, method="least_squares", learning_rate=0.01, iterations=1000):
+    def fit(
+        self,
+        X,
+        y,
+        method="least_squares",
+        learning_rate=None,
+        iterations=1000,
+        tol=1e-6,
+    ):
         """
         Fit the model using either normal equation or gradient descent.
 
         Args:
-            X (np.ndarray): Independent variable data (2D array).
+            X (np.ndarray or scipy.sparse matrix): Independent variable data
+                        (2D array), e.g. the output of one_hot_encode.
             y (np.ndarray): Dependent variable data (1D array).
             method (str): method to train linear regression coefficients.
-                        It may be "least_squares" or "gradient_descent".
-            learning_rate (float): Learning rate for gradient descent.
+                        It may be "least_squares", "qr" or "gradient_descent".
+            learning_rate (float): Learning rate for gradient descent. If
+                        None, a stable step is derived from the largest
+                        eigenvalue of the Gram matrix (power iteration).
             iterations (int): Number of iterations for gradient descent.
+            tol (float): Gradient-norm tolerance for early stopping in
+                        gradient descent.
 
         Returns:
             None: Modifies the model's coefficients and intercept in-place.
+            Inputs are cast to float32, so the fitted parameters are float32.
         """
-        if method not in ["least_squares", "gradient_descent"]:
+        if method not in ["least_squares", "qr", "gradient_descent"]:
             raise ValueError(
                 f"Method {method} not available for training linear regression."
             )
         if np.ndim(X) == 1:
             X = X.reshape(-1, 1)
 
+        # Standardize to one contiguous float32 layout up front: halves the
+        # bytes moved through BLAS and keeps every downstream kernel on the
+        # fast contiguous path. Fitted coefficients are therefore float32.
+        # Sparse input (e.g. from one_hot_encode on a high-cardinality
+        # column) stays sparse; the Gram build consumes it natively.
+        if scipy.sparse.issparse(X):
+            X = X.tocsr().astype(np.float32)
+        else:
+            X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.ascontiguousarray(y, dtype=np.float32)
+
         if method == "least_squares":
             self.fit_multiple(X, y)
+        elif method == "qr":
+            self.fit_qr(X, y)
         elif method == "gradient_descent":
-            self.fit_gradient_descent(X, y, learning_rate, iterations)
+            self.fit_gradient_descent(X, y, learning_rate, iterations, tol)
+
+    def _add_bias_column(self, X):
+        """
+        Return X augmented with a leading column of ones, reusing a cached
+        buffer across calls. Repeated fits on same-shaped data only refresh
+        the data columns instead of allocating a fresh m x (n+1) array.
+        """
+        m, n = X.shape
+        buf = self._Xb_buffer
+        if buf is None or buf.shape != (m, n + 1) or buf.dtype != X.dtype:
+            buf = np.empty((m, n + 1), dtype=X.dtype)
+            buf[:, 0] = 1
+            self._Xb_buffer = buf
+        buf[:, 1:] = X
+        return buf
 
     def fit_multiple(self, X, y):
         """
@@ -60,92 +278,179 @@ class LinearRegressor:
         Returns:
             None: Modifies the model's coefficients and intercept in-place.
         """
-        # Add a column of ones to X to account for the intercept
-        X_b = np.c_[np.ones((X.shape[0], 1)), X]
-
-        # Calculate the best fit line using the normal equation
-        theta_best = np.linalg.pinv(X_b.T.dot(X_b)).dot(X_b.T).dot(y)
+        # Solve the normal equations. The Gram matrix X_b.T @ X_b is symmetric
+        # positive definite whenever X_b has full column rank, so a Cholesky
+        # factorization is much cheaper than the SVD hidden inside pinv.
+        # _gram_factors folds in the bias column and handles sparse X.
+        G, rhs = _gram_factors(X, y)
+        try:
+            c, low = scipy.linalg.cho_factor(
+                G, lower=True, overwrite_a=True, check_finite=False
+            )
+            theta_best = scipy.linalg.cho_solve((c, low), rhs, check_finite=False)
+        except np.linalg.LinAlgError:
+            # Rank-deficient input: fall back to a minimum-norm least-squares
+            # fit (LAPACK is dense-only, so sparse input is densified here)
+            if scipy.sparse.issparse(X):
+                X = X.toarray()
+            X_b = self._add_bias_column(X)
+            theta_best = np.linalg.lstsq(X_b, y, rcond=None)[0]
 
         self.intercept = theta_best[0]
         self.coefficients = theta_best[1:]
 
-    def fit_gradient_descent(self, X, y, learning_rate=0.01, iterations=1000):
+    def fit_qr(self, X, y):
+        """
+        Fit the model by solving the least-squares problem on X_b directly.
+
+        np.linalg.lstsq factors the augmented design matrix itself, which
+        avoids building the Gram matrix (and squaring its condition number)
+        and handles rank-deficient input out of the box.
+
+        Args:
+            X (np.ndarray): Independent variable data (2D array).
+            y (np.ndarray): Dependent variable data (1D array).
+
+        Returns:
+            None: Modifies the model's coefficients and intercept in-place.
+        """
+        if scipy.sparse.issparse(X):
+            X = X.toarray()  # LAPACK's least-squares driver is dense-only
+        X_b = self._add_bias_column(X)
+        theta, *_ = np.linalg.lstsq(X_b, y, rcond=None)
+
+        self.intercept = theta[0]
+        self.coefficients = theta[1:]
+
+    def fit_gradient_descent(
+        self, X, y, learning_rate=None, iterations=1000, tol=1e-6, plot=False
+    ):
         """
         Fit the model using gradient descent.
 
         Args:
-            X (np.ndarray): Independent variable data (2D array), with bias.
+            X (np.ndarray): Independent variable data (2D array), without a
+                        bias column; the intercept is handled separately.
             y (np.ndarray): Dependent variable data (1D array).
-            learning_rate (float): Learning rate for gradient descent.
+            learning_rate (float): Learning rate for gradient descent. If
+                        None, it is auto-tuned to 0.9/L where L is the
+                        curvature bound 2*lambda_max(X_b.T X_b)/m estimated
+                        by power iteration.
             iterations (int): Number of iterations for gradient descent.
+            tol (float): Gradient-norm tolerance; the loop stops early (check
+                        every 10 epochs) once ||g|| < tol * (1 + ||theta||).
+            plot (bool): Whether to draw the training plots after fitting.
 
         Returns:
             None: Modifies the model's coefficients and intercept in-place.
         """
 
-        # Initialize the parameters to very small values (close to 0)
+        # No bias column anywhere in this path: the ones column's products
+        # reduce to plain sums, so the intercept is handled separately and a
+        # column of memory traffic per epoch is skipped.
         m, n = X.shape
-        self.coefficients = np.random.rand(n) * 0.01  # Small random numbers
-        self.intercept = np.random.rand() * 0.01
-
-        # Store the history of coefficients and intercept
-        history = {"intercept": [], "coefficients": []}
+        if scipy.sparse.issparse(X):
+            X = X.tocsr().astype(np.float32)
+        else:
+            X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.ascontiguousarray(y, dtype=np.float32)
 
-        # Implement gradient descent
-        for epoch in range(iterations):
-            predictions = self.predict(X)
-            error = predictions - y
+        # Initialize the parameters to very small values (close to 0)
+        theta = (np.random.rand(n + 1) * 0.01).astype(X.dtype)  # Small random numbers
+
+        # Preallocate the parameter/loss history so the loop does a cheap
+        # slice-assignment per epoch instead of growing Python lists of
+        # freshly copied arrays.
+        history_theta = np.empty((iterations, n + 1), dtype=theta.dtype)
+        mse_history = np.empty(iterations, dtype=theta.dtype)
+
+        # Run the whole descent inside the (Numba-compiled) kernel. When the
+        # system is overdetermined, precompute the Gram factors once so the
+        # per-epoch cost is O(n^2) instead of O(m*n); otherwise fall back to
+        # the X-based updates.
+        if m >= n + 1:
+            G, h = _gram_factors(X, y)
+            yty = y @ y
+            if learning_rate is None:
+                # Gradient Lipschitz constant is L = 2*lambda_max(G)/m;
+                # lr = 0.9/L keeps the iteration stable with a safety margin
+                learning_rate = 0.45 * m / _power_iteration_lmax(G)
+            epochs_run = _gd_gram_kernel(
+                G, h, yty, m, theta, learning_rate, iterations, tol,
+                history_theta, mse_history,
+            )
+        else:
+            if scipy.sparse.issparse(X):
+                # Underdetermined problems have few rows, so the dense
+                # kernel is the right tool even for sparse input
+                X = np.ascontiguousarray(X.toarray())
+            if learning_rate is None:
+                # Same spectrum as X_b.T @ X_b via the smaller m x m matrix;
+                # the ones column contributes a rank-one all-ones term
+                learning_rate = 0.45 * m / _power_iteration_lmax(X @ X.T + 1.0)
+            epochs_run = _gd_kernel(
+                X, y, theta, learning_rate, iterations, tol,
+                history_theta, mse_history,
+            )
 
-            gradient_coefficients = (2 * learning_rate / m) * X.T.dot(error)
-            gradient_intercept = (2 * learning_rate / m) * np.sum(error)
+        self.intercept = theta[0]
+        self.coefficients = theta[1:]
+        self.intercept_history = history_theta[:epochs_run, 0]
+        self.coefficients_history = history_theta[:epochs_run, 1:]
+        self.training_history_ = mse_history[:epochs_run]
 
-            self.intercept -= gradient_intercept
-            self.coefficients -= gradient_coefficients
+        if plot:
+            self.plot_training_history()
 
-            # Store the current state of the parameters
-            history["intercept"].append(self.intercept)
-            history["coefficients"].append(self.coefficients.copy())
+    def plot_training_history(self):
+        """
+        Plot the loss curve and parameter updates of the last gradient
+        descent fit. Matplotlib is imported lazily so training (and plain
+        prediction) never pays its import or GUI cost.
 
-            # Calculate and print the loss every 10 epochs
-            if epoch % 10 == 0:
-                mse = np.mean(error**2)
-                print(f"Epoch {epoch}: MSE = {mse}")
-                if epoch == 0:
-                    training_history = {"epoch": [], "mse": []}
-                training_history["epoch"].append(epoch)
-                training_history["mse"].append(mse)
+        Raises:
+            ValueError: If the model has not been fitted with gradient descent.
+        """
+        if self.training_history_ is None:
+            raise ValueError("Model is not yet fitted with gradient descent")
 
+        import matplotlib.pyplot as plt
 
         # Plot training history
         plt.figure(figsize=(10, 6))
-        plt.plot(training_history["epoch"], training_history["mse"], label="MSE", color='purple')
+        plt.plot(self.training_history_, label="MSE", color='purple')
         plt.xlabel("Epoch")
         plt.ylabel("Mean Squared Error")
         plt.title("Training History")
         plt.legend()
-        plt.show()
 
-        # Plot the parameter updates with better separation
-        num_coefficients = len(history["coefficients"][0])
+        # Plot all parameter updates as stacked subplots of a single figure:
+        # one Figure per coefficient costs tens of ms of GUI work each
+        num_coefficients = self.coefficients_history.shape[1]
+        fig, axes = plt.subplots(
+            num_coefficients + 1,
+            1,
+            figsize=(10, 2 * (num_coefficients + 1)),
+            sharex=True,
+        )
+        axes[0].plot(self.intercept_history, label="Intercept", color='blue')
+        axes[0].set_ylabel("Value")
+        axes[0].set_title("Parameter Updates")
+        axes[0].legend()
 
-        # Plot intercept updates
-        plt.figure(figsize=(10, 6))
-        plt.plot(history["intercept"], label="Intercept", color='blue')
-        plt.xlabel("Iteration")
-        plt.ylabel("Value")
-        plt.title("Intercept Updates")
-        plt.legend()
-
-        # Plot each coefficient in separate plots
         colors = plt.cm.viridis(np.linspace(0, 1, num_coefficients))
         for i in range(num_coefficients):
-            plt.figure(figsize=(10, 6))
-            plt.plot([coef[i] for coef in history["coefficients"]], label=f"Coefficient {i+1}", color=colors[i])
-            plt.xlabel("Iteration")
-            plt.ylabel("Value")
-            plt.title(f"Coefficient {i+1} Updates")
-            plt.legend()
-            plt.show()
+            ax = axes[i + 1]
+            ax.plot(
+                self.coefficients_history[:, i],
+                label=f"Coefficient {i+1}",
+                color=colors[i],
+            )
+            ax.set_ylabel("Value")
+            ax.legend()
+        axes[-1].set_xlabel("Iteration")
+        fig.tight_layout()
+        plt.show()
 
     def predict(self, X):
         """
@@ -165,11 +470,11 @@ class LinearRegressor:
 
         if np.ndim(X) == 1:
             # Predict when X is only one variable
-            predictions = self.intercept + self.coefficients[0] * X
+            predictions = np.multiply(X, self.coefficients[0]) + self.intercept
         else:
-            # Predict when X is more than one variable
-            X_b = np.c_[np.ones((X.shape[0], 1)), X]
-            predictions = X_b.dot(np.r_[self.intercept, self.coefficients])
+            # Predict when X is more than one variable: one gemv plus a
+            # broadcast add, with no bias column or parameter concatenation
+            predictions = X @ self.coefficients + self.intercept
 
         return predictions
 
@@ -186,16 +491,22 @@ def evaluate_regression(y_true, y_pred):
         dict: A dictionary containing the R^2, RMSE, and MAE values.
     """
 
+    # Compute the residual once and derive every metric from it; the dot
+    # products run as BLAS reductions without materializing squared temporaries
+    r = y_pred - y_true
+    ss_res = r @ r
+
     # R^2 Score
-    ss_res = np.sum((y_true - y_pred) * (y_true - y_pred))
-    ss_tot = np.sum((y_true - np.mean(y_true)) * (y_true - np.mean(y_true)))
+    ym = y_true.mean()
+    dy = y_true - ym
+    ss_tot = dy @ dy
     r_squared = 1 - (ss_res / ss_tot)
 
     # Root Mean Squared Error
-    rmse = np.sqrt(np.mean((y_true - y_pred) ** 2))
+    rmse = np.sqrt(ss_res / r.size)
 
     # Mean Absolute Error
-    mae = np.mean(np.abs(y_true - y_pred))
+    mae = np.mean(np.abs(r))
 
     return {"R2": r_squared, "RMSE": rmse, "MAE": mae}
 
@@ -211,22 +522,41 @@ def one_hot_encode(X, categorical_indices, drop_first=False):
         drop_first (bool): Whether to drop the first level of one-hot encoding to avoid multicollinearity.
 
     Returns:
-        np.ndarray: Transformed array with one-hot encoded columns.
+        np.ndarray or scipy.sparse.csr_matrix: Transformed array with one-hot
+        encoded columns. The result is sparse when any categorical column has
+        more than 16 unique values, since its dense block would be mostly
+        zeros.
     """
-    X_transformed = []
+    # O(1) categorical lookup per column instead of scanning the list
+    cat_mask = np.zeros(X.shape[1], dtype=bool)
+    cat_mask[list(categorical_indices)] = True
+
+    m = X.shape[0]
+    blocks = []
+    any_sparse = False
     for i in range(X.shape[1]):
-        if i in categorical_indices:
-            # Get unique categories
-            categories = np.unique(X[:, i])
+        if cat_mask[i]:
+            vals, inv = np.unique(X[:, i], return_inverse=True)
+            if len(vals) > _SPARSE_CATEGORY_THRESHOLD:
+                # High cardinality: one nonzero per row, so store only the
+                # (row, category) index pairs instead of a dense block
+                block = scipy.sparse.csr_matrix(
+                    (np.ones(m, dtype=np.float32), (np.arange(m), inv)),
+                    shape=(m, len(vals)),
+                )
+                any_sparse = True
+            else:
+                # Build the whole one-hot block in a single gather instead of
+                # one comparison pass per category
+                block = np.eye(len(vals), dtype=np.float32)[inv]
             if drop_first:
-                categories = categories[
-                    1:
+                block = block[
+                    :, 1:
                 ]  # Drop the first category to avoid multicollinearity
-            # Create one-hot encoded columns
-            for category in categories:
-                one_hot_column = (X[:, i] == category).astype(float)
-                X_transformed.append(one_hot_column)
+            blocks.append(block)
         else:
-            X_transformed.append(X[:, i].astype(float))
+            blocks.append(X[:, i].astype(np.float32, copy=False).reshape(-1, 1))
 
-    return np.column_stack(X_transformed)
+    if any_sparse:
+        return scipy.sparse.hstack(blocks, format="csr")
+    return np.hstack(blocks)
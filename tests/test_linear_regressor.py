@@ -1,5 +1,6 @@
 import pytest
 import numpy as np
+import scipy.sparse
 from src.Lab_2_4_LR2 import (
     LinearRegressor,
     evaluate_regression,
@@ -47,6 +48,33 @@ def test_one_hot_encode():
     )  # Original numeric column + 3 one-hot encoded columns
 
 
+def test_fit_qr():
+    X = np.array([[1], [2], [3], [4], [5]])
+    y = np.array([2, 4, 6, 8, 10])
+    model = LinearRegressor()
+    model.fit(X, y, method="qr")
+
+    assert np.isclose(model.intercept, 0, atol=1e-1)
+    assert np.isclose(model.coefficients[0], 2, atol=1e-1)
+
+
+def test_fit_with_sparse_one_hot():
+    n_samples, n_categories = 100, 20
+    labels = np.array([f"cat{i % n_categories}" for i in range(n_samples)])
+    values = np.arange(n_samples, dtype=float)
+    X = np.column_stack([labels, values]).astype(object)
+
+    X_encoded = one_hot_encode(X, [0], drop_first=True)
+    assert scipy.sparse.issparse(X_encoded)  # >16 categories go sparse
+
+    y = 3 * values + 1
+    model = LinearRegressor()
+    model.fit(X_encoded, y, method="least_squares")
+    predictions = model.predict(X_encoded)
+
+    assert np.allclose(predictions, y, atol=1e-1)
+
+
 def test_fit_gradient_descent():
     X = np.array([[1], [2], [3], [4], [5]])
     y = np.array([2, 4, 6, 8, 10])